@@ -1,60 +1,84 @@
 """
 Tests for the Mergington High School API
 """
+import copy
+import orjson
 import pytest
-from fastapi.testclient import TestClient
-import sys
-from pathlib import Path
-
-# Add src directory to path
-sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+import pytest_asyncio
+from asgi_lifespan import LifespanManager
+from httpx import ASGITransport, AsyncClient
 
 from app import app, activities
 
+# Activities as loaded, captured before any test runs
+PRISTINE_ACTIVITIES = copy.deepcopy(activities)
+
+# Participants of every activity as loaded
+ORIGINAL_PARTICIPANTS = {
+    name: frozenset(details["participants"]) for name, details in PRISTINE_ACTIVITIES.items()
+}
+
+# Activity paths used by the signup/unregister tests
+CHESS = "/activities/Chess Club"
+TENNIS = "/activities/Tennis Club"
+DEBATE = "/activities/Debate Team"
+NONEXISTENT = "/activities/Nonexistent Club"
+
+
+@pytest_asyncio.fixture(scope="session")
+async def lifespan_app():
+    """Wrap the app in its lifespan once for the whole session
+
+    The app defines no startup or shutdown handlers yet, so this is a no-op
+    today; it keeps any future lifespan hooks from running per test.
+    """
+    async with LifespanManager(app) as manager:
+        yield manager.app
+
+
+@pytest_asyncio.fixture(scope="session")
+async def client(lifespan_app):
+    """Create one async test client for the whole session, bound directly to the ASGI app"""
+    async with AsyncClient(transport=ASGITransport(app=lifespan_app), base_url="http://test") as ac:
+        yield ac
+
 
-@pytest.fixture
-def client():
-    """Create a test client"""
-    return TestClient(app)
-
-
-@pytest.fixture
-def reset_activities():
-    """Reset activities to initial state before each test"""
-    # Store original state
-    original_activities = {
-        activity: {
-            "description": details["description"],
-            "schedule": details["schedule"],
-            "max_participants": details["max_participants"],
-            "participants": details["participants"].copy()
-        }
-        for activity, details in activities.items()
-    }
-    
+@pytest.fixture(autouse=True)
+def reset_activities(request):
+    """Restore activities to their initial state after each mutating test
+
+    With ``pytest -n auto --dist load`` every xdist worker is a separate
+    process with its own copy of ``activities``, so tests can be spread
+    across workers and this stays function-scoped within each one.
+    """
     yield
-    
-    # Restore original state
+    if "mutates" not in request.keywords:
+        return
     activities.clear()
-    activities.update(original_activities)
+    activities.update(copy.deepcopy(PRISTINE_ACTIVITIES))
+
+
+def rjson(response):
+    """Decode a response body with orjson"""
+    return orjson.loads(response.content)
 
 
 class TestGetActivities:
     """Test suite for GET /activities endpoint"""
 
-    def test_get_activities_returns_all_activities(self, client, reset_activities):
+    async def test_get_activities_returns_all_activities(self, client):
         """Test that all activities are returned"""
-        response = client.get("/activities")
+        response = await client.get("/activities")
         assert response.status_code == 200
-        data = response.json()
+        data = rjson(response)
         assert len(data) == 9
         assert "Chess Club" in data
         assert "Programming Class" in data
 
-    def test_get_activities_contains_required_fields(self, client, reset_activities):
+    async def test_get_activities_contains_required_fields(self, client):
         """Test that each activity has required fields"""
-        response = client.get("/activities")
-        data = response.json()
+        response = await client.get("/activities")
+        data = rjson(response)
         
         for activity_name, details in data.items():
             assert "description" in details
@@ -62,10 +86,10 @@ class TestGetActivities:
             assert "max_participants" in details
             assert "participants" in details
 
-    def test_chess_club_has_correct_data(self, client, reset_activities):
+    async def test_chess_club_has_correct_data(self, client):
         """Test Chess Club has correct initial data"""
-        response = client.get("/activities")
-        data = response.json()
+        response = await client.get("/activities")
+        data = rjson(response)
         chess = data["Chess Club"]
         
         assert chess["description"] == "Learn strategies and compete in chess tournaments"
@@ -74,154 +98,133 @@ class TestGetActivities:
         assert "daniel@mergington.edu" in chess["participants"]
 
 
+@pytest.mark.mutates
 class TestSignupForActivity:
     """Test suite for POST /activities/{activity_name}/signup endpoint"""
 
-    def test_signup_new_participant(self, client, reset_activities):
-        """Test signing up a new participant"""
-        response = client.post(
-            "/activities/Chess Club/signup?email=newstudent@mergington.edu"
-        )
-        assert response.status_code == 200
-        data = response.json()
-        assert "Signed up" in data["message"]
-        assert "newstudent@mergington.edu" in data["message"]
+    @pytest.mark.parametrize("activity_name, emails", [
+        ("Chess Club", ["newstudent@mergington.edu"]),
+        ("Programming Class", ["student1@mergington.edu", "student2@mergington.edu"]),
+    ], ids=["single", "multiple"])
+    async def test_signup_new_participants(self, client, activity_name, emails):
+        """Test signing up one or more new participants"""
+        for email in emails:
+            response = await client.post(
+                f"/activities/{activity_name}/signup", params={"email": email}
+            )
+            assert response.status_code == 200
+            data = rjson(response)
+            assert "Signed up" in data["message"]
+            assert email in data["message"]
         
-        # Verify participant was added
-        activities_response = client.get("/activities")
-        participants = activities_response.json()["Chess Club"]["participants"]
-        assert "newstudent@mergington.edu" in participants
+        # Verify every participant was added to the in-memory store
+        assert set(emails) <= set(activities[activity_name]["participants"])
 
-    def test_signup_for_nonexistent_activity(self, client, reset_activities):
+    async def test_signup_for_nonexistent_activity(self, client):
         """Test signing up for an activity that doesn't exist"""
-        response = client.post(
-            "/activities/Nonexistent Club/signup?email=student@mergington.edu"
+        response = await client.post(
+            f"{NONEXISTENT}/signup", params={"email": "student@mergington.edu"}
         )
         assert response.status_code == 404
-        assert "Activity not found" in response.json()["detail"]
+        assert "Activity not found" in rjson(response)["detail"]
 
-    def test_signup_duplicate_participant(self, client, reset_activities):
+    async def test_signup_duplicate_participant(self, client):
         """Test signing up a participant who is already signed up"""
-        response = client.post(
-            "/activities/Chess Club/signup?email=michael@mergington.edu"
+        response = await client.post(
+            f"{CHESS}/signup", params={"email": "michael@mergington.edu"}
         )
         assert response.status_code == 400
-        assert "already signed up" in response.json()["detail"]
-
-    def test_signup_multiple_participants(self, client, reset_activities):
-        """Test signing up multiple different participants"""
-        email1 = "student1@mergington.edu"
-        email2 = "student2@mergington.edu"
-        
-        response1 = client.post(f"/activities/Programming Class/signup?email={email1}")
-        response2 = client.post(f"/activities/Programming Class/signup?email={email2}")
-        
-        assert response1.status_code == 200
-        assert response2.status_code == 200
-        
-        # Verify both were added
-        activities_response = client.get("/activities")
-        participants = activities_response.json()["Programming Class"]["participants"]
-        assert email1 in participants
-        assert email2 in participants
+        assert "already signed up" in rjson(response)["detail"]
 
-    def test_signup_preserves_existing_participants(self, client, reset_activities):
+    async def test_signup_preserves_existing_participants(self, client):
         """Test that signup preserves existing participants"""
-        original_response = client.get("/activities")
-        original_participants = original_response.json()["Tennis Club"]["participants"].copy()
+        original_participants = ORIGINAL_PARTICIPANTS["Tennis Club"]
         
-        response = client.post(
-            "/activities/Tennis Club/signup?email=newtennis@mergington.edu"
+        response = await client.post(
+            f"{TENNIS}/signup", params={"email": "newtennis@mergington.edu"}
         )
         assert response.status_code == 200
         
-        # Verify original participants are still there
-        updated_response = client.get("/activities")
-        updated_participants = updated_response.json()["Tennis Club"]["participants"]
-        for participant in original_participants:
-            assert participant in updated_participants
+        # Verify original participants are still in the in-memory store
+        updated_participants = activities["Tennis Club"]["participants"]
+        assert original_participants <= set(updated_participants)
 
 
+@pytest.mark.mutates
 class TestUnregisterFromActivity:
     """Test suite for DELETE /activities/{activity_name}/unregister endpoint"""
 
-    def test_unregister_existing_participant(self, client, reset_activities):
+    async def test_unregister_existing_participant(self, client):
         """Test unregistering an existing participant"""
-        response = client.delete(
-            "/activities/Chess Club/unregister?email=michael@mergington.edu"
+        response = await client.delete(
+            f"{CHESS}/unregister", params={"email": "michael@mergington.edu"}
         )
         assert response.status_code == 200
-        data = response.json()
+        data = rjson(response)
         assert "Unregistered" in data["message"]
+        assert "michael@mergington.edu" in data["message"]
         
-        # Verify participant was removed
-        activities_response = client.get("/activities")
-        participants = activities_response.json()["Chess Club"]["participants"]
-        assert "michael@mergington.edu" not in participants
+        # Verify participant was removed from the in-memory store
+        assert "michael@mergington.edu" not in activities["Chess Club"]["participants"]
 
-    def test_unregister_nonexistent_activity(self, client, reset_activities):
+    async def test_unregister_nonexistent_activity(self, client):
         """Test unregistering from an activity that doesn't exist"""
-        response = client.delete(
-            "/activities/Nonexistent Club/unregister?email=student@mergington.edu"
+        response = await client.delete(
+            f"{NONEXISTENT}/unregister", params={"email": "student@mergington.edu"}
         )
         assert response.status_code == 404
-        assert "Activity not found" in response.json()["detail"]
+        assert "Activity not found" in rjson(response)["detail"]
 
-    def test_unregister_participant_not_signed_up(self, client, reset_activities):
+    async def test_unregister_participant_not_signed_up(self, client):
         """Test unregistering a participant who is not signed up"""
-        response = client.delete(
-            "/activities/Chess Club/unregister?email=notstudent@mergington.edu"
+        response = await client.delete(
+            f"{CHESS}/unregister", params={"email": "notstudent@mergington.edu"}
         )
         assert response.status_code == 400
-        assert "not signed up" in response.json()["detail"]
+        assert "not signed up" in rjson(response)["detail"]
 
-    def test_unregister_preserves_other_participants(self, client, reset_activities):
+    async def test_unregister_preserves_other_participants(self, client):
         """Test that unregister preserves other participants"""
-        original_response = client.get("/activities")
-        original_participants = original_response.json()["Debate Team"]["participants"].copy()
+        original_participants = ORIGINAL_PARTICIPANTS["Debate Team"]
         
         # Unregister one participant
-        response = client.delete(
-            "/activities/Debate Team/unregister?email=lucas@mergington.edu"
+        response = await client.delete(
+            f"{DEBATE}/unregister", params={"email": "lucas@mergington.edu"}
         )
         assert response.status_code == 200
         
-        # Verify other participants are still there
-        updated_response = client.get("/activities")
-        updated_participants = updated_response.json()["Debate Team"]["participants"]
+        # Verify other participants are still in the in-memory store
+        updated_participants = activities["Debate Team"]["participants"]
         
         assert "lucas@mergington.edu" not in updated_participants
-        for participant in original_participants:
-            if participant != "lucas@mergington.edu":
-                assert participant in updated_participants
+        assert original_participants - {"lucas@mergington.edu"} <= set(updated_participants)
 
-    def test_unregister_then_signup_same_participant(self, client, reset_activities):
+    async def test_unregister_then_signup_same_participant(self, client):
         """Test unregistering and then signing up the same participant"""
         email = "michael@mergington.edu"
         
         # Unregister
-        unregister_response = client.delete(
-            f"/activities/Chess Club/unregister?email={email}"
+        unregister_response = await client.delete(
+            f"{CHESS}/unregister", params={"email": email}
         )
         assert unregister_response.status_code == 200
         
         # Sign up again
-        signup_response = client.post(
-            f"/activities/Chess Club/signup?email={email}"
+        signup_response = await client.post(
+            f"{CHESS}/signup", params={"email": email}
         )
         assert signup_response.status_code == 200
+        assert email in rjson(signup_response)["message"]
         
-        # Verify participant is back
-        activities_response = client.get("/activities")
-        participants = activities_response.json()["Chess Club"]["participants"]
-        assert email in participants
+        # Verify participant is back in the in-memory store
+        assert email in activities["Chess Club"]["participants"]
 
 
 class TestRootEndpoint:
     """Test suite for GET / endpoint"""
 
-    def test_root_redirect(self, client, reset_activities):
+    async def test_root_redirect(self, client):
         """Test that root endpoint redirects to static index"""
-        response = client.get("/", follow_redirects=False)
+        response = await client.get("/", follow_redirects=False)
         assert response.status_code == 307
         assert "/static/index.html" in response.headers["location"]